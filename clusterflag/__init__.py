@@ -1 +1,61 @@
+""" clusterflag: Reproduce country flags with numpy and pandas
+
+The package is split into layers, which are only imported when first used
+(e.g. clusterflag.sample_flag imports numpy but not pandas):
+
+    sampling, geometry, virtual : numpy sampling core and flag geometry
+    render, metrics, lifting, drift : numpy tools for large flags and streams
+    country_flags, checkpoint : pandas data frames and csv output
+"""
+
+import importlib
+
 __version__ = '0.1.2'
+
+_attributes = {
+    'simple_flag': 'country_flags',
+    'japan_flag': 'country_flags',
+    'laos_flag': 'country_flags',
+    'cross_flag': 'country_flags',
+    'crescent_flag': 'country_flags',
+    'sample_flag': 'sampling',
+    'sample_region': 'sampling',
+    'VirtualFlag': 'virtual',
+    'allocate_points': 'geometry',
+    'flag_areas': 'geometry',
+    'flag_regions': 'geometry',
+    'flag_params': 'geometry',
+    'partition_npoints': 'geometry',
+    'render_flag': 'render',
+    'flag_counts': 'render',
+    'colour_counts': 'render',
+    'contingency_table': 'metrics',
+    'merge_tables': 'metrics',
+    'cluster_scores': 'metrics',
+    'lift_flag': 'lifting',
+    'drift_stream': 'drift',
+    'flag_checkpoint': 'checkpoint',
+    'generate_flag': 'checkpoint',
+    'write_flag': 'checkpoint',
+    'save_checkpoint': 'checkpoint',
+    'load_checkpoint': 'checkpoint'}
+
+_submodules = ['checkpoint', 'country_flags', 'drift', 'geometry', 'lifting',
+               'metrics', 'render', 'sampling', 'virtual']
+
+__all__ = list(_attributes)
+
+def __getattr__(name):
+    if name in _attributes:
+        module = importlib.import_module('.' + _attributes[name], __name__)
+        value = getattr(module, name)
+    elif name in _submodules:
+        value = importlib.import_module('.' + name, __name__)
+    else:
+        raise AttributeError("module {!r} has no attribute {!r}"
+                             .format(__name__, name))
+    globals()[name] = value
+    return(value)
+
+def __dir__():
+    return(sorted(set(globals()) | set(__all__) | set(_submodules)))
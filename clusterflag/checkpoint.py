@@ -0,0 +1,181 @@
+""" checkpoint: Resumable, appendable flag generation
+"""
+
+import json
+import os
+import numpy as np
+from . import country_flags
+
+builders = ['simple_flag', 'japan_flag', 'laos_flag', 'cross_flag',
+            'crescent_flag']
+
+def flag_checkpoint(flag, nchunks, seed=None, **params):
+
+    """Start a resumable flag generation
+
+    Large datasets are generated as a sequence of chunks, where each chunk
+    is the output of a single call to the flag builder. The checkpoint
+    records everything needed to continue the sequence: the builder and its
+    parameters, the state of the random number generator, and the number of
+    chunks, rows and points per partition produced so far. It only contains
+    json types, so it can be saved (see save_checkpoint) and restored in
+    another process. Generation resumed from a checkpoint produces exactly
+    the same output as an uninterrupted run.
+
+    Parameters
+    ----------
+    flag : string or function, no default, required
+        Flag builder (e.g. 'crescent_flag' or crescent_flag)
+
+    nchunks : int, no default, required
+        Number of chunks to generate.
+        Increase checkpoint['nchunks'] to append more chunks later.
+
+    seed : int, default None
+        Seed of the random number generator
+
+    **params :
+        Arguments passed to the flag builder for each chunk
+        (e.g. npoints=[100000]*5 or total=500000). Numpy scalars and arrays
+        are converted to python numbers and lists.
+
+    Returns
+    -------
+    checkpoint : dict
+    """
+
+    name = getattr(flag, '__name__', flag)
+    if name not in builders:
+        raise ValueError("flag must be one of " + ", ".join(builders))
+    try:
+        params = json.loads(json.dumps(params, default=_to_json))
+    except TypeError as error:
+        raise ValueError("params must be json serializable: {}"
+                         .format(error))
+    state = np.random.RandomState(seed).get_state(legacy=False)
+    return({'flag': name, 'params': params, 'nchunks': int(nchunks),
+            'chunks': 0, 'rows': 0, 'counts': [], 'nbytes': 0,
+            'state': _state_to_json(state)})
+
+def generate_flag(checkpoint):
+
+    """Generate the remaining chunks of a flag
+
+    Continues the generation described by checkpoint (see flag_checkpoint)
+    until checkpoint['nchunks'] chunks have been produced. The global numpy
+    random state is left untouched.
+
+    Parameters
+    ----------
+    checkpoint : dict, no default, required
+        Output of flag_checkpoint or load_checkpoint (not modified)
+
+    Returns
+    -------
+    output : generator of (pandas data frame, dict) tuples
+        Each chunk (indexed by its row numbers within the full dataset) and
+        the checkpoint after that chunk
+    """
+
+    checkpoint = json.loads(json.dumps(checkpoint))
+    builder = getattr(country_flags, checkpoint['flag'])
+    while checkpoint['chunks'] < checkpoint['nchunks']:
+        old_state = np.random.get_state()
+        try:
+            np.random.set_state(_state_from_json(checkpoint['state']))
+            output = builder(**checkpoint['params'])
+            state = np.random.get_state(legacy=False)
+        finally:
+            np.random.set_state(old_state)
+        output.index = np.arange(checkpoint['rows'],
+                                 checkpoint['rows'] + len(output))
+        counts = np.bincount(output['partition'],
+                             minlength=len(checkpoint['counts']))
+        counts[:len(checkpoint['counts'])] += np.array(checkpoint['counts'],
+                                                       dtype=np.int64)
+        checkpoint = dict(checkpoint, chunks=checkpoint['chunks'] + 1,
+                          rows=checkpoint['rows'] + len(output),
+                          counts=counts.tolist(),
+                          state=_state_to_json(state))
+        yield(output, checkpoint)
+
+def write_flag(path, checkpoint_path, checkpoint=None):
+
+    """Generate a flag into a csv file, saving a checkpoint after each chunk
+
+    If the process is killed, calling write_flag again with the same paths
+    resumes from the last saved checkpoint: any partially written chunk is
+    truncated from the file before generation continues. To append more
+    points to a finished dataset, increase checkpoint['nchunks'] (e.g. of
+    the output or load_checkpoint(checkpoint_path)) and call it again.
+
+    Parameters
+    ----------
+    path : string, no default, required
+        Path of the csv file
+
+    checkpoint_path : string, no default, required
+        Path of the checkpoint (json) file
+
+    checkpoint : dict, default None
+        Output of flag_checkpoint. Required for a new dataset.
+        If None, the checkpoint is loaded from checkpoint_path.
+
+    Returns
+    -------
+    checkpoint : dict
+        The checkpoint after the final chunk
+    """
+
+    if checkpoint is None:
+        checkpoint = load_checkpoint(checkpoint_path)
+    if checkpoint['rows'] == 0:
+        # new dataset: discard anything left over from earlier runs
+        open(path, 'wb').close()
+    save_checkpoint(checkpoint, checkpoint_path)
+    with open(path, 'r+b') as f:
+        f.truncate(checkpoint['nbytes'])
+    with open(path, 'ab') as f:
+        for output, checkpoint in generate_flag(checkpoint):
+            f.write(output.to_csv(header=checkpoint['chunks'] == 1,
+                                  index=False).encode())
+            f.flush()
+            os.fsync(f.fileno())
+            checkpoint['nbytes'] = f.tell()
+            save_checkpoint(checkpoint, checkpoint_path)
+    return(checkpoint)
+
+def save_checkpoint(checkpoint, path):
+
+    """Save a checkpoint to a json file
+
+    The file is replaced atomically, so an interrupted save never leaves a
+    corrupted checkpoint behind.
+    """
+
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp_path, path)
+
+def load_checkpoint(path):
+
+    """Load a checkpoint from a json file"""
+
+    with open(path) as f:
+        return(json.load(f))
+
+def _to_json(value):
+    if isinstance(value, (np.generic, np.ndarray)):
+        return(value.tolist())
+    raise TypeError("{!r} is not json serializable".format(value))
+
+def _state_to_json(state):
+    state = dict(state, state=dict(state['state']))
+    state['state']['key'] = state['state']['key'].tolist()
+    return(state)
+
+def _state_from_json(state):
+    state = dict(state, state=dict(state['state']))
+    state['state']['key'] = np.array(state['state']['key'], dtype=np.uint32)
+    return(state)
@@ -3,9 +3,17 @@
 
 import numpy as np
 import pandas as pd
+from .geometry import (allocate_points, stripe_limits, simple_flag_areas,
+                       japan_flag_areas, laos_flag_areas, cross_flag_areas,
+                       crescent_flag_areas, japan_flag_check, laos_flag_check,
+                       cross_flag_check, crescent_flag_check)
+
+__all__ = ['simple_flag', 'japan_flag', 'laos_flag', 'cross_flag',
+           'crescent_flag']
     
 def simple_flag(npoints=[100,100,100], colours=['green','white','orange'], 
-               ratio=1.5, sep=0.0, horizontal=False):
+               ratio=1.5, sep=0.0, horizontal=False, total=None,
+               density=None, weights=None, bounds=None):
     
     """Construct a simple flag (e.g. Ireland). 
     
@@ -43,37 +51,66 @@ def simple_flag(npoints=[100,100,100], colours=['green','white','orange'],
         Horizontal (e.g. Germany) or vertical (e.g. Ireland) partitons/stripes.
         The default is False, meaning vertical stripes are generated.
         
+    total : int, default None
+        If specified, npoints is ignored and this number of points is
+        distributed across the partitions in proportion to their area
+        (see geometry.allocate_points), so that the flag has a uniform
+        density of points.
+        The number of partitions is then determined by colours.
+
+    density : float, default None
+        If specified, npoints is ignored and points are distributed across
+        the partitions with this expected number of points per unit area.
+
+    weights : float list, default None
+        Density multiplier of each partition if total or density is
+        specified. For example, weights = [1, 2, 1] doubles the density of
+        the second (middle) stripe relative to the others.
+
+    bounds : float list (length = number of partitions - 1), default None
+        Positions of the boundaries between the partitions, as a proportion
+        of the flag's length (vertical) or width (horizontal).
+        For example, bounds = [0.2, 0.5] creates stripes covering 20%, 30%
+        and 50% of the flag. The default is equally sized stripes.
+
     Returns
     -------
-    output : pandas data frame (shape = (sum(npoints), 3))
+    output : pandas data frame (shape = (sum(npoints), 4))
         x: cartesian coordinates along x-axis
         y: cartesian coordinates along y-axis
         flag_col: colour of point
+        partition: index of the partition containing the point
     """
     
+    if total is not None or density is not None:
+        npoints = allocate_points(simple_flag_areas(len(colours), ratio, sep,
+                                                    bounds),
+                                  total=total, density=density,
+                                  weights=weights)
     parts = len(npoints)
     if parts != len(colours):
         raise ValueError("npoints and colours parameters must be same length")
-    shrink = (1 - (parts - 1)*sep)/parts
+    lows, widths = stripe_limits(parts, sep, bounds)
     if horizontal:
-        output = [(np.random.uniform(0, shrink, size=(npoints[i], 1)) +
-                   (i*(shrink + sep)))
+        output = [(np.random.uniform(0, widths[i], size=(npoints[i], 1)) +
+                   lows[i])
         for i in range(parts) if npoints[i] > 0]
         output = np.concatenate((np.random.random((sum(npoints), 1)) * ratio,
                                  np.concatenate(output)), axis=1)  
     else:
-        output=[ratio * (np.random.uniform(0, shrink, size=(npoints[i], 1)) + 
-                         (i*(shrink + sep)))
+        output=[ratio * (np.random.uniform(0, widths[i], 
+                                           size=(npoints[i], 1)) + lows[i])
         for i in range(parts) if npoints[i] > 0]
         output = np.concatenate((np.concatenate(output),
                                  np.random.random((sum(npoints), 1))), axis=1)
     output = pd.DataFrame(output, columns = ['x', 'y'])
     output['flag_col'] = [colours[n]  for (n, ttt) in enumerate(npoints)
     for i in range(ttt)]
+    output['partition'] = np.repeat(np.arange(parts), npoints)
     return(output)
     
 def ellipse_points(npoints, cx, cy, rx, ry, 
-                   xlen=None, ylen=None, inside=True):
+                   xlen=None, ylen=None, inside=True, uniform=False):
     
     """Generate points from inside/outside ellipse.
     
@@ -109,6 +146,12 @@ def ellipse_points(npoints, cx, cy, rx, ry,
     inside : boolean, default True
         Return points inside or outside of circle. The default value is True,
         meaning that random points within the circle are returned.
+
+    uniform : boolean, default False
+        If True, points inside the ellipse are uniformly distributed.
+        The default value is False, meaning that the distance from the
+        centre is uniformly distributed, so points are denser near the
+        centre. Points outside the ellipse are always uniform.
         
     Returns
     -------
@@ -117,6 +160,11 @@ def ellipse_points(npoints, cx, cy, rx, ry,
     
     if(inside):
         deg = np.random.uniform(0, 2*np.pi, (npoints, 1))
+        if uniform:
+            # the square root makes the density independent of the radius
+            r = np.sqrt(np.random.uniform(0, 1, (npoints, 1)))
+            return(np.concatenate((rx*r*np.sin(deg) + cx,
+                                   ry*r*np.cos(deg) + cy), axis=1))
         r0 = np.random.uniform(0, rx, (npoints, 1))
         r1 = np.random.uniform(0,ry, (npoints, 1))
         return(np.concatenate((r0*np.sin(deg) + cx,
@@ -132,7 +180,8 @@ def ellipse_points(npoints, cx, cy, rx, ry,
  
 
 def japan_flag(npoints=[100,100], cenx=0.5, ceny=0.5, rx=0.3, ry=0.3, sep=0.0, 
-              colours=['red','white'], ratio=1.5):
+              colours=['red','white'], ratio=1.5, total=None, density=None,
+              weights=None):
     
     """Flag with a circle
     
@@ -173,32 +222,55 @@ def japan_flag(npoints=[100,100], cenx=0.5, ceny=0.5, rx=0.3, ry=0.3, sep=0.0,
         For example, the Swiss flag has a ratio of 1 (i.e. square) and
         the Irish flag has a ratio of 1.5.
         
+    total : int, default None
+        If specified, npoints is ignored and this number of points is
+        distributed across the partitions in proportion to their area
+        (see geometry.allocate_points), so that the flag has a uniform
+        density of points. Points are then also uniformly distributed
+        within the ellipse, which npoints concentrates near its centre.
+
+    density : float, default None
+        If specified, npoints is ignored and points are distributed across
+        the partitions with this expected number of points per unit area.
+
+    weights : float list, default None
+        Density multiplier of each partition if total or density is
+        specified. For example, weights = [3, 1] triples the density of
+        the ellipse relative to the background.
+
     Returns
     -------
-    output : pandas data frame (shape = (sum(npoints), 3))
+    output : pandas data frame (shape = (sum(npoints), 4))
         x: cartesian coordinates along x-axis
         y: cartesian coordinates along y-axis
         flag_col: colour of point
+        partition: index of the partition containing the point
     """
-    if rx >= 0.5 or rx <= 0 or ry >= 0.5 or ry <= 0:
-        raise ValueError("Radii must be greater than 0 and less than 0.5")
-    if sep<0 or sep >= 0.5:
-        raise ValueError("sep must be not be negative or greater than 0.5")
+    japan_flag_check(rx, ry, sep)
+    if total is not None or density is not None:
+        npoints = allocate_points(japan_flag_areas(rx, ry, sep, ratio),
+                                  total=total, density=density,
+                                  weights=weights)
     if len(npoints) != len(colours):
         raise ValueError("npoints and colours parameters must be same length")    
+    return(_ellipse_flag(npoints, cenx, ceny, rx, ry, sep, colours, ratio,
+                         uniform=total is not None or density is not None))
+
+def _ellipse_flag(npoints, cenx, ceny, rx, ry, sep, colours, ratio, uniform):
     fground = ellipse_points(npoints[0], cenx*ratio, ceny, 
-                              rx, ry, ratio, 1, inside=True)    
+                              rx, ry, ratio, 1, inside=True, uniform=uniform)
     bground = ellipse_points(npoints[1],cenx*ratio, ceny, 
                               rx+sep, ry+sep, ratio, 1, inside=False)
     output = np.concatenate((fground, bground))
     output = pd.DataFrame(output, columns=['x', 'y'])
     output['flag_col']= [colours[n]  for (n, ttt) in enumerate(npoints) 
     for i in range(ttt)]
+    output['partition'] = np.repeat(np.arange(2), npoints)
     return(output)
 
 def laos_flag(npoints=[100,100,100], cenx=0.5, ceny=0.5, rx=0.2, ry=0.2, 
              rect=0.25, colours=['red', 'white', 'blue'], ratio=1.5, 
-             horizontal=True):
+             horizontal=True, total=None, density=None, weights=None):
     
     """Flag with a circle between two borders
     
@@ -245,56 +317,89 @@ def laos_flag(npoints=[100,100,100], cenx=0.5, ceny=0.5, rx=0.2, ry=0.2,
         Horizontal (e.g. Laos) or vertical (no examples) border stripes.
         The default is True, meaning horizontal border stripes are generated.    
         
+    total : int, default None
+        If specified, npoints is ignored and this number of points is
+        distributed across the partitions in proportion to their area
+        (see geometry.allocate_points), so that the flag has a uniform
+        density of points. Points are then also uniformly distributed
+        within the ellipse, which npoints concentrates near its centre.
+        The points allocated to the first partition are split between the
+        two border rectangles (the top/right border receives any spare
+        point).
+
+    density : float, default None
+        If specified, npoints is ignored and points are distributed across
+        the partitions with this expected number of points per unit area.
+
+    weights : float list, default None
+        Density multiplier of each partition if total or density is
+        specified. For example, weights = [1, 2, 1] doubles the density of
+        the ellipse relative to the borders and background.
+
     Returns
     -------
-    output : pandas data frame (shape = (sum(npoints), 3))
+    output : pandas data frame (shape = (sum(npoints), 4))
         x: cartesian coordinates along x-axis
         y: cartesian coordinates along y-axis
         flag_col: colour of point
+        partition: index of the partition containing the point
     """
-    if rect <=0 or rect>=0.5:
-        raise ValueError("rect should be drawn from (0, 0.5)")
+    laos_flag_check(rx, ry, rect, horizontal)
+    uniform = total is not None or density is not None
+    if uniform:
+        npoints = allocate_points(laos_flag_areas(rx, ry, rect, ratio),
+                                  total=total, density=density,
+                                  weights=weights)
     if len(npoints) != len(colours):
         raise ValueError("npoints and colours parameters must be same length")
+    if uniform:
+        # the allocation of the first partition covers both borders
+        nborders = [npoints[0] - npoints[0]//2, npoints[0]//2]
+    else:
+        nborders = [npoints[0], npoints[0]]
     if not horizontal:
         top_rect = np.concatenate((np.random.uniform((1 - rect)*ratio, ratio,
-                                                     size=(npoints[0], 1)),
+                                                     size=(nborders[0], 1)),
                                    np.random.uniform(0, 1,
-                                                     size=(npoints[0], 1))),
+                                                     size=(nborders[0], 1))),
                                   axis=1)
         bottom_rect = np.concatenate((np.random.uniform(0, ratio*rect,
-                                                        size=(npoints[0], 1)),
+                                                        size=(nborders[1], 1)),
                                       np.random.uniform(0, 1, 
-                                                        size=(npoints[0], 1))),
+                                                        size=(nborders[1], 1))),
                                     axis=1)
-        middle_part =  japan_flag(npoints[1:3],cenx=cenx, ceny=ceny, 
-                                  rx=rx/(1 - 2*rect), ry=ry, sep=0,
-                                 colours=colours[1:3], ratio=1.5)
+        middle_part = _ellipse_flag(npoints[1:3], cenx, ceny,
+                                    rx/(1 - 2*rect), ry, 0, colours[1:3],
+                                    ratio, uniform)
         middle_part['x'] = rect*ratio + middle_part['x']*(1 - 2*rect)
     else:
         top_rect = np.concatenate((np.random.uniform(0, ratio,
-                                                     size=(npoints[0], 1)),
+                                                     size=(nborders[0], 1)),
                                    np.random.uniform(1-rect, 1,
-                                                     size=(npoints[0], 1))),
+                                                     size=(nborders[0], 1))),
                                   axis=1)
         bottom_rect = np.concatenate((np.random.uniform(0, ratio,
-                                                        size=(npoints[0], 1)),
+                                                        size=(nborders[1], 1)),
                                       np.random.uniform(0, rect,
-                                                        size=(npoints[0], 1))),
+                                                        size=(nborders[1], 1))),
                                   axis=1)
-        middle_part = japan_flag(npoints[1:3], rx=rx/(1 - 2*rect), 
-                                 ry=ry/(1 - 2*rect), colours=colours[1:3], 
-                                 ratio=ratio/(1 - 2*rect))
+        middle_part = _ellipse_flag(npoints[1:3], cenx, ceny,
+                                    rx/(1 - 2*rect), ry/(1 - 2*rect), 0,
+                                    colours[1:3], ratio/(1 - 2*rect),
+                                    uniform)
         middle_part['x'] = middle_part['x']*(1 - 2*rect)
         middle_part['y'] = rect + middle_part['y']*(1 - 2*rect)
     rects=pd.DataFrame(np.concatenate((top_rect, bottom_rect)),
                        columns=['x', 'y'])
     rects['flag_col'] = colours[0]
+    rects['partition'] = 0
+    middle_part['partition'] += 1
     return(pd.concat([rects, middle_part]))
     
 def cross_flag(npoints=[100, 100, 100, 100, 100], cenx=0.5, ceny=0.5,
                rectx=0.2, recty=0.2, 
-               colours=['red', 'blue', 'white', 'green', 'orange'], ratio=1.5):
+               colours=['red', 'blue', 'white', 'green', 'orange'], ratio=1.5,
+               total=None, density=None, weights=None):
     
     """Generate flag with a cross
     
@@ -330,13 +435,38 @@ def cross_flag(npoints=[100, 100, 100, 100, 100], cenx=0.5, ceny=0.5,
         For example, the Swiss flag has a ratio of 1 (i.e. square) and
         the Irish flag has a ratio of 1.5.
         
+    total : int, default None
+        If specified, npoints is ignored and this number of points is
+        distributed across the partitions in proportion to their area
+        (see geometry.allocate_points), so that the flag has a uniform
+        density of points. Points are then also uniformly distributed
+        within the cross, whose centre (where the arms overlap) is denser
+        if npoints is specified.
+
+    density : float, default None
+        If specified, npoints is ignored and points are distributed across
+        the partitions with this expected number of points per unit area.
+
+    weights : float list, default None
+        Density multiplier of each partition if total or density is
+        specified. For example, weights = [1, 1, 1, 1, 2] doubles the
+        density of the cross relative to the four rectangles.
+
     Returns
     -------
-    output : pandas data frame (shape = (sum(npoints), 3))
+    output : pandas data frame (shape = (sum(npoints), 4))
         x: cartesian coordinates along x-axis
         y: cartesian coordinates along y-axis
         flag_col: colour of point
+        partition: index of the partition containing the point
     """
+    cross_flag_check(cenx, ceny, rectx, recty, ratio)
+    uniform = total is not None or density is not None
+    if uniform:
+        npoints = allocate_points(cross_flag_areas(cenx, ceny, rectx, recty,
+                                                   ratio),
+                                  total=total, density=density,
+                                  weights=weights)
     if len(npoints) != len(colours):
         raise ValueError("npoints and colours parameters must be same length")
     shift_rectx = rectx/ratio
@@ -359,17 +489,32 @@ def cross_flag(npoints=[100, 100, 100, 100, 100], cenx=0.5, ceny=0.5,
     output = pd.DataFrame(np.transpose(output), columns=['x', 'y']) 
     output['flag_col'] = [colours[n]  
            for (n, ttt) in enumerate(npoints[:4]) for i in range(ttt)]
+    output['partition'] = np.repeat(np.arange(4), npoints[:4])
     if(npoints[4] < 1):
         return(output)
-    horizes = np.random.uniform(0, 1, npoints[4]) > 0.5
+    if uniform:
+        # choose each arm in proportion to its area, counting the overlap
+        # of the two arms once (as part of the horizontal arm)
+        horizes = np.random.uniform(0, 1, npoints[4]) < \
+                  ratio*recty/(ratio*recty + rectx*(1 - recty))
+    else:
+        horizes = np.random.uniform(0, 1, npoints[4]) > 0.5
     striped_part = np.random.uniform(0, 1, (npoints[4], 2))
     striped_part[horizes] = striped_part[horizes]*[[ratio,recty]] + \
                             [[0, ceny - recty/2]]
-    striped_part[np.invert(horizes)] = striped_part[np.invert(horizes)] * \
-                                       [[rectx, 1]] + \
-                                       [[(cenx*ratio) - rectx/2, 0]]
+    verts = np.invert(horizes)
+    if uniform:
+        # the vertical arm skips the overlap
+        striped_part[verts] = striped_part[verts]*[[rectx, 1 - recty]] + \
+                              [[(cenx*ratio) - rectx/2, 0]]
+        striped_part[verts & (striped_part[:, 1] >= ceny - recty/2), 1] += \
+            recty
+    else:
+        striped_part[verts] = striped_part[verts]*[[rectx, 1]] + \
+                              [[(cenx*ratio) - rectx/2, 0]]
     striped_part = pd.DataFrame(striped_part,columns=['x', 'y'])
     striped_part['flag_col'] = colours[4]
+    striped_part['partition'] = 4
     return(pd.concat([output, striped_part]))
 
 def crescent_points(bcx, bcy, scx, scy, bradius, sradius, 
@@ -464,8 +609,8 @@ def crescent_points(bcx, bcy, scx, scy, bradius, sradius,
                 thepoint = np.random.uniform(low=[[0, rect]], 
                                              high=[[xlen, ylen-rect]])
             else:
-                thepoint = np.random.uniform(low=[[rect, 0]], 
-                                             high=[[xlen-rect, ylen]])
+                thepoint = np.random.uniform(low=[[rect*xlen, 0]], 
+                                             high=[[(1-rect)*xlen, ylen]])
             if np.sum((thepoint - [bcx,bcy])**2) < bradius**2 and \
                np.sum((thepoint - [scx,scy])**2) > sradius**2:
                 continue
@@ -502,7 +647,8 @@ def crescent_flag(npoints=[100,100,100,100,100], bcx=0.5, bcy=0.5,
                         starcx=0.6, starcy=0.5, starrx=0.05, 
                         starry=0.05, rect=0.2,
                         colours=['white', 'white', 'black', 'green', 'red'], 
-                        ratio=1.5, horizontal=True):
+                        ratio=1.5, horizontal=True, total=None, density=None,
+                        weights=None):
     
     """Flags with a crescent
     
@@ -591,18 +737,41 @@ def crescent_flag(npoints=[100,100,100,100,100], bcx=0.5, bcy=0.5,
         The default is True, meaning horizontal border stripes are considered.
         
         
+    total : int, default None
+        If specified, npoints is ignored and this number of points is
+        distributed across the partitions in proportion to their area
+        (see geometry.allocate_points), so that the flag has a uniform
+        density of points.
+
+    density : float, default None
+        If specified, npoints is ignored and points are distributed across
+        the partitions with this expected number of points per unit area.
+
+    weights : float list, default None
+        Density multiplier of each partition if total or density is
+        specified. For example, weights = [2, 2, 1, 1, 1] doubles the
+        density of the crescent and star relative to the background and
+        borders.
+
     Returns
     -------
-    output : pandas data frame (shape = (sum(npoints), 3))
+    output : pandas data frame (shape = (sum(npoints), 4))
         x: cartesian coordinates along x-axis
         y: cartesian coordinates along y-axis
         flag_col: colour of point
+        partition: index of the partition containing the point
     """
     
     if len(npoints) != len(colours):
         raise ValueError("npoints and colours parameters must be same length")
-    if rect < 0 or rect >= 0.5:
-        raise ValueError("rect should be from [0,0.5)")
+    crescent_flag_check(bradius, sradius, rect)
+    if total is not None or density is not None:
+        npoints = allocate_points(crescent_flag_areas(bcx, bcy, scx, scy,
+                                                      bradius, sradius,
+                                                      starrx, starry, rect,
+                                                      ratio),
+                                  total=total, density=density,
+                                  weights=weights)
     crescent_part = [crescent_points(bcx=bcx*ratio, bcy=bcy, scx=scx*ratio, 
                                      scy=scy,bradius=bradius, sradius=sradius,
                                      starcx=starcx*ratio, starcy=starcy,
@@ -652,6 +821,7 @@ def crescent_flag(npoints=[100,100,100,100,100], bcx=0.5, bcy=0.5,
                           columns=['x', 'y'])
     output['flag_col'] = [colours[n] for (n,ttt) in enumerate(npoints) 
                          for i in range(ttt)]
+    output['partition'] = np.repeat(np.arange(5), npoints)
     return(output)
     
     
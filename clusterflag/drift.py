@@ -0,0 +1,122 @@
+""" drift: Flag streams whose geometry changes over time
+"""
+
+import numpy as np
+from .geometry import (allocate_points, builder_args, flag_areas, flag_params,
+                       flag_regions)
+from .sampling import sample_region
+
+# flag arguments that can't change gradually (pass them as fixed params)
+discrete_args = ['parts', 'horizontal']
+
+def drift_stream(flag, schedule, times, chunk_size=10000, seed=None,
+                 weights=None, shuffle=True, **params):
+
+    """Stream of flag chunks with drifting parameters
+
+    Designed for benchmarking online (incremental) clustering algorithms.
+    At each timestamp, the scheduled flag parameters (e.g. the centre of
+    the cross in cross_flag, the radii in japan_flag or the stripe bounds
+    in simple_flag) are evaluated, and a chunk of points is drawn from the
+    flag with those parameters. Points are allocated to partitions in
+    proportion to their area (see geometry.allocate_points), and each
+    chunk is generated with vectorized operations, so memory depends on
+    chunk_size only, however long the stream.
+
+    Parameters
+    ----------
+    flag : string or function, no default, required
+        Flag (e.g. 'cross_flag' or cross_flag)
+
+    schedule : dict, no default, required
+        Value of each drifting parameter over time. Values can be either
+        a function of the timestamp, e.g. {'cenx': lambda t: 0.3 + 0.4*t},
+        or (timestamps, values) keyframes that are linearly interpolated,
+        e.g. {'cenx': ([0, 1], [0.3, 0.7])}. Keyframe values can be lists,
+        e.g. {'bounds': ([0, 1], [[0.2, 0.5], [0.4, 0.8]])}.
+        Keys must be geometry arguments of the flag (see
+        geometry.flag_params), otherwise a TypeError is raised.
+        Discrete arguments (parts, horizontal) can't be scheduled and
+        raise a ValueError.
+
+    times : float iterable, no default, required
+        Timestamp of each chunk (e.g. np.linspace(0, 1, 1000)).
+        The stream ends when times is exhausted.
+
+    chunk_size : int, default 10000
+        The number of points within each chunk
+
+    seed : int or numpy Generator, default None
+        Seed of the random number generator
+
+    weights : float list, default None
+        Density multiplier of each partition (see geometry.allocate_points)
+
+    shuffle : boolean, default True
+        Shuffle the points within each chunk. If False, the points of each
+        chunk are ordered by partition.
+
+    **params :
+        Fixed flag parameters (e.g. ratio=2), see the flag builders.
+        Builder arguments that don't affect the geometry (e.g. colours) are
+        ignored, while unknown arguments raise a TypeError.
+        Like the schedule, the names are checked when drift_stream is called,
+        before any chunk is generated.
+
+    Returns
+    -------
+    output : generator of (float, numpy array, int numpy array) tuples
+        For each chunk, the timestamp, the x and y coordinates of the
+        points (shape = (chunk_size, 2)) and the index of the partition
+        containing each point (length = chunk_size)
+
+    Examples
+    --------
+    >>> stream = drift_stream('cross_flag', {'cenx': ([0, 1], [0.3, 0.7])},
+    ...                       times=np.linspace(0, 1, 100), seed=0)
+    >>> for (t, points, labels) in stream:
+    ...     model.partial_fit(points)
+    """
+
+    name = getattr(flag, '__name__', flag)
+    names = set(flag_params(flag))
+    unknown = sorted(set(schedule) - names)
+    if unknown:
+        raise TypeError("Unknown scheduled arguments for {}: {}".format(
+            name, ", ".join(unknown)))
+    unknown = sorted(set(params) - names - set(builder_args))
+    if unknown:
+        raise TypeError("Unknown arguments for {}: {}".format(
+            name, ", ".join(unknown)))
+    discrete = sorted(set(schedule) & set(discrete_args))
+    if discrete:
+        raise ValueError("{} can't be scheduled, pass fixed values "
+                         "instead".format(", ".join(discrete)))
+    return(_stream(flag, schedule, times, chunk_size, seed, weights, shuffle,
+                   params))
+
+def _stream(flag, schedule, times, chunk_size, seed, weights, shuffle, params):
+    rng = np.random.default_rng(seed)
+    for t in times:
+        current = dict(params)
+        for (param, value) in schedule.items():
+            current[param] = _scheduled(value, t)
+        regions = flag_regions(flag, weights=weights, **current)
+        npoints = allocate_points(flag_areas(flag, weights=weights, **current),
+                                  total=chunk_size, weights=weights, rng=rng)
+        points = np.concatenate([sample_region(rng, region, n)
+                                 for (region, n) in zip(regions, npoints)])
+        labels = np.repeat(np.arange(len(regions)), npoints)
+        if shuffle:
+            order = rng.permutation(chunk_size)
+            points, labels = points[order], labels[order]
+        yield(t, points, labels)
+
+def _scheduled(value, t):
+    if callable(value):
+        return(value(t))
+    times, values = value
+    values = np.asarray(values, dtype=np.float64)
+    if values.ndim == 1:
+        return(float(np.interp(t, times, values)))
+    return([float(np.interp(t, times, column)) for column in values.T])
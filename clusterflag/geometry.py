@@ -0,0 +1,597 @@
+""" geometry: Partition areas of the flags in country_flags
+"""
+
+import numpy as np
+
+# builder arguments that don't affect the geometry of a flag
+builder_args = ['npoints', 'colours', 'total', 'density', 'weights']
+
+def allocate_points(areas, total=None, density=None, weights=None, rng=None):
+
+    """Allocate points to partitions in proportion to their area
+
+    Draws the number of points within each partition from a single
+    multinomial distribution, where the probability of each partition is
+    proportional to its area (multiplied by its weight). This produces a
+    uniform density across the flag, unless weights are specified.
+
+    Parameters
+    ----------
+    areas : float list, no default, required
+        Area of each partition (e.g. output of simple_flag_areas).
+        Negative areas (i.e. invalid flag geometry) raise a ValueError.
+
+    total : int, default None
+        Total number of points across all partitions.
+        Exactly one of total and density must be specified.
+
+    density : float, default None
+        Expected number of points per unit area.
+        The total number of points is density x (weighted) flag area.
+
+    weights : float list, default None
+        Density multiplier of each partition, where the i-th value
+        determines the relative density of the i-th partition.
+        For example, weights = [1, 2, 1] doubles the density of the middle
+        stripe of the Irish flag. Input 0 if you want no points within
+        a partition. Defaults to 1 for every partition.
+
+    rng : numpy Generator, default None
+        Source of random numbers. Defaults to the global numpy random state
+        (i.e. np.random.seed makes the output reproducible).
+
+    Returns
+    -------
+    npoints : int list
+        The number of points within each partition
+        (e.g. the npoints argument of simple_flag)
+    """
+
+    if (total is None) == (density is None):
+        raise ValueError("Specify exactly one of total and density")
+    areas = np.asarray(areas, dtype=np.float64)
+    if (areas < 0).any():
+        raise ValueError("areas must not be negative (check that the flag "
+                         "geometry lies within the flag)")
+    if weights is None:
+        weights = np.ones(len(areas))
+    elif len(weights) != len(areas):
+        raise ValueError("weights must include a value for every partition")
+    mass = areas*np.asarray(weights, dtype=np.float64)
+    if density is not None:
+        total = int(round(density*mass.sum()))
+    if total < 0:
+        raise ValueError("total and density must not be negative")
+    if mass.sum() <= 0:
+        raise ValueError("weighted area of flag must be greater than 0")
+    if rng is None:
+        rng = np.random
+    return(rng.multinomial(total, mass/mass.sum()).tolist())
+
+def flag_areas(flag, **params):
+
+    """Partition areas of any flag
+
+    Parameters
+    ----------
+    flag : string or function, no default, required
+        Flag (e.g. 'cross_flag' or cross_flag)
+
+    **params :
+        Flag arguments (e.g. cenx=0.4). Builder arguments that don't affect
+        the areas (e.g. colours) are ignored, while unknown arguments raise
+        a TypeError. Arguments that the flag builder rejects (see
+        japan_flag_check) raise a ValueError.
+        As in simple_flag, parts defaults to the length of npoints, weights
+        or colours, whichever is given first.
+
+    Returns
+    -------
+    output : float list
+    """
+
+    return(_call(flag, '_areas', params))
+
+def flag_regions(flag, **params):
+
+    """Partition regions of any flag (see simple_flag_regions)
+
+    Parameters
+    ----------
+    flag : string or function, no default, required
+        Flag (e.g. 'cross_flag' or cross_flag)
+
+    **params :
+        Flag arguments (e.g. cenx=0.4), see flag_areas
+
+    Returns
+    -------
+    output : list of (boxes, test) tuples
+    """
+
+    return(_call(flag, '_regions', params))
+
+def partition_npoints(flag, npoints):
+
+    """Number of points within each partition of a flag
+
+    The flag builders take the number of points within each partition,
+    except that laos_flag draws npoints[0] points within each of its two
+    border rectangles (i.e. 2*npoints[0] points in the first partition).
+
+    Parameters
+    ----------
+    flag : string or function, no default, required
+        Flag (e.g. 'laos_flag' or laos_flag)
+
+    npoints : int list, no default, required
+        The npoints argument of the flag builder
+
+    Returns
+    -------
+    output : int list
+    """
+
+    output = [int(n) for n in npoints]
+    if getattr(flag, '__name__', flag) == 'laos_flag':
+        output[0] *= 2
+    return(output)
+
+def _partition_count(flag, params):
+    # simple_flag has as many stripes as npoints (or weights/colours) values
+    if getattr(flag, '__name__', flag) != 'simple_flag' or 'parts' in params:
+        return(params)
+    for name in ['npoints', 'weights', 'colours']:
+        if params.get(name) is not None:
+            return(dict(params, parts=len(params[name])))
+    return(params)
+
+def flag_params(flag):
+
+    """Names of the geometry arguments of a flag
+
+    Parameters
+    ----------
+    flag : string or function, no default, required
+        Flag (e.g. 'cross_flag' or cross_flag)
+
+    Returns
+    -------
+    output : string list
+        Arguments of the flag's area and region functions
+        (e.g. simple_flag_areas and simple_flag_regions)
+    """
+
+    output = []
+    for suffix in ['_areas', '_regions']:
+        for name in _arg_names(_flag_function(flag, suffix)):
+            if name not in output:
+                output.append(name)
+    return(output)
+
+def ellipse_area(rx, ry):
+
+    """Area of an ellipse with radii rx and ry"""
+
+    return(np.pi*rx*ry)
+
+def circle_overlap_area(radius0, radius1, dist):
+
+    """Area of the intersection of two circles
+
+    Parameters
+    ----------
+    radius0 : float, no default, required
+        Radius of first circle
+
+    radius1 : float, no default, required
+        Radius of second circle
+
+    dist : float, no default, required
+        Distance between the circle centres
+
+    Returns
+    -------
+    output : float
+    """
+
+    if dist >= radius0 + radius1:
+        return(0.0)
+    if dist <= abs(radius0 - radius1):
+        return(np.pi*min(radius0, radius1)**2)
+    angle0 = np.arccos((dist**2 + radius0**2 - radius1**2)/(2*dist*radius0))
+    angle1 = np.arccos((dist**2 + radius1**2 - radius0**2)/(2*dist*radius1))
+    kite = np.sqrt((-dist + radius0 + radius1)*(dist + radius0 - radius1) *
+                   (dist - radius0 + radius1)*(dist + radius0 + radius1))
+    return(radius0**2*angle0 + radius1**2*angle1 - kite/2)
+
+def stripe_limits(parts=3, sep=0.0, bounds=None):
+
+    """Position of the stripes of simple_flag
+
+    Parameters
+    ----------
+    parts : int, default 3
+        The number of partitions (i.e. stripes)
+
+    sep, bounds : see simple_flag
+
+    Returns
+    -------
+    lows : float list (length = parts)
+        Start of each stripe, as a proportion of the flag's length (or width)
+
+    widths : float list (length = parts)
+        Width of each stripe, as a proportion of the flag's length (or width)
+    """
+
+    if bounds is None:
+        shrink = (1 - (parts - 1)*sep)/parts
+        return([i*(shrink + sep) for i in range(parts)], [shrink]*parts)
+    if len(bounds) != parts - 1:
+        raise ValueError("bounds must include a value for every boundary "
+                         "between partitions")
+    lows = [0] + [bound + sep/2 for bound in bounds]
+    highs = [bound - sep/2 for bound in bounds] + [1]
+    widths = [high - low for (low, high) in zip(lows, highs)]
+    if min(widths) <= 0:
+        raise ValueError("bounds must be increasing and at least sep apart")
+    return(lows, widths)
+
+def japan_flag_check(rx=0.3, ry=0.3, sep=0.0):
+
+    """Check the arguments of japan_flag
+
+    Called by japan_flag and by flag_areas/flag_regions, so that the flag
+    builder and the numpy sampling core reject the same arguments.
+
+    Parameters
+    ----------
+    rx, ry, sep : see japan_flag
+
+    Raises
+    ------
+    ValueError
+        If the radii or sep are out of range
+    """
+
+    if rx >= 0.5 or rx <= 0 or ry >= 0.5 or ry <= 0:
+        raise ValueError("Radii must be greater than 0 and less than 0.5")
+    if sep < 0 or sep >= 0.5:
+        raise ValueError("sep must be not be negative or greater than 0.5")
+
+def laos_flag_check(rx=0.2, ry=0.2, rect=0.25, horizontal=True):
+
+    """Check the arguments of laos_flag (see japan_flag_check)
+
+    The ellipse is drawn between the borders, whose width must therefore
+    leave room for the ellipse.
+
+    Parameters
+    ----------
+    rx, ry, rect, horizontal : see laos_flag
+    """
+
+    if rect <= 0 or rect >= 0.5:
+        raise ValueError("rect should be drawn from (0, 0.5)")
+    if horizontal:
+        japan_flag_check(rx/(1 - 2*rect), ry/(1 - 2*rect))
+    else:
+        japan_flag_check(rx/(1 - 2*rect), ry)
+
+def cross_flag_check(cenx=0.5, ceny=0.5, rectx=0.2, recty=0.2, ratio=1.5):
+
+    """Check the arguments of cross_flag (see japan_flag_check)
+
+    Parameters
+    ----------
+    cenx, ceny, rectx, recty, ratio : see cross_flag
+    """
+
+    if rectx <= 0 or recty <= 0:
+        raise ValueError("rectx and recty must be greater than 0")
+    if (cenx*ratio - rectx/2 < 0 or (1 - cenx)*ratio - rectx/2 < 0 or
+            ceny - recty/2 < 0 or 1 - (ceny + recty/2) < 0):
+        raise ValueError("cross must lie within the flag")
+
+def crescent_flag_check(bradius=0.125, sradius=0.1, rect=0.2):
+
+    """Check the arguments of crescent_flag (see japan_flag_check)
+
+    Parameters
+    ----------
+    bradius, sradius, rect : see crescent_flag
+    """
+
+    if rect < 0 or rect >= 0.5:
+        raise ValueError("rect should be from [0,0.5)")
+    if bradius >= 0.5 or bradius <= 0 or sradius >= 0.5 or sradius <= 0:
+        raise ValueError("Radii must be greater than 0 and less than 0.5")
+
+def simple_flag_areas(parts=3, ratio=1.5, sep=0.0, bounds=None):
+
+    """Partition areas of simple_flag
+
+    Parameters
+    ----------
+    parts : int, default 3
+        The number of partitions (i.e. stripes).
+        Ignored if bounds is specified.
+
+    ratio, sep, bounds : see simple_flag
+
+    Returns
+    -------
+    output : float list (length = parts)
+    """
+
+    if bounds is not None:
+        parts = len(bounds) + 1
+    return([ratio*width for width in stripe_limits(parts, sep, bounds)[1]])
+
+def japan_flag_areas(rx=0.3, ry=0.3, sep=0.0, ratio=1.5):
+
+    """Partition areas of japan_flag
+
+    Assumes that the ellipse (plus boundary) lies within the flag.
+
+    Parameters
+    ----------
+    rx, ry, sep, ratio : see japan_flag
+
+    Returns
+    -------
+    output : float list (length = 2)
+        Areas of the ellipse and background
+    """
+
+    return([ellipse_area(rx, ry), ratio - ellipse_area(rx + sep, ry + sep)])
+
+def laos_flag_areas(rx=0.2, ry=0.2, rect=0.25, ratio=1.5):
+
+    """Partition areas of laos_flag
+
+    Assumes that the ellipse lies within the flag.
+
+    Parameters
+    ----------
+    rx, ry, rect, ratio : see laos_flag
+
+    Returns
+    -------
+    output : float list (length = 3)
+        Areas of the two border rectangles (combined), ellipse and background
+    """
+
+    return([2*rect*ratio, ellipse_area(rx, ry),
+            (1 - 2*rect)*ratio - ellipse_area(rx, ry)])
+
+def cross_flag_areas(cenx=0.5, ceny=0.5, rectx=0.2, recty=0.2, ratio=1.5):
+
+    """Partition areas of cross_flag
+
+    Parameters
+    ----------
+    cenx, ceny, rectx, recty, ratio : see cross_flag
+
+    Returns
+    -------
+    output : float list (length = 5)
+        Areas of the top left, bottom left, top right and bottom right
+        rectangles and the cross
+    """
+
+    left = cenx*ratio - rectx/2
+    right = (1 - cenx)*ratio - rectx/2
+    top = 1 - (ceny + recty/2)
+    bottom = ceny - recty/2
+    return([left*top, left*bottom, right*top, right*bottom,
+            ratio*recty + rectx - rectx*recty])
+
+def crescent_flag_areas(bcx=0.5, bcy=0.5, scx=0.53, scy=0.5, bradius=0.125,
+                        sradius=0.1, starrx=0.05, starry=0.05, rect=0.2,
+                        ratio=1.5):
+
+    """Partition areas of crescent_flag
+
+    Assumes that the crescent and star lie between the borders and do not
+    overlap each other. The areas are the same for horizontal and vertical
+    borders.
+
+    Parameters
+    ----------
+    bcx, bcy, scx, scy, bradius, sradius, starrx, starry, rect,
+    ratio : see crescent_flag
+
+    Returns
+    -------
+    output : float list (length = 5)
+        Areas of the crescent, star, background, bottom/left border and
+        top/right border
+    """
+
+    dist = np.hypot((bcx - scx)*ratio, bcy - scy)
+    crescent = np.pi*bradius**2 - circle_overlap_area(bradius, sradius, dist)
+    star = 4*starrx*starry
+    middle = ratio*(1 - 2*rect)
+    return([crescent, star, middle - crescent - star, rect*ratio, rect*ratio])
+
+def simple_flag_regions(parts=3, ratio=1.5, sep=0.0, horizontal=False,
+                        bounds=None):
+
+    """Partition regions of simple_flag
+
+    Each region is a (boxes, test) tuple, where boxes is a list of
+    (xmin, ymin, xmax, ymax) rectangles that together cover the partition
+    and test is None or a function of the x and y coordinates that returns
+    True for points (within the boxes) that lie in the partition.
+    Regions are sampled by sampling.sample_region.
+
+    Parameters
+    ----------
+    parts : int, default 3
+        The number of partitions (i.e. stripes).
+        Ignored if bounds is specified.
+
+    ratio, sep, horizontal, bounds : see simple_flag
+
+    Returns
+    -------
+    output : list of (boxes, test) tuples (length = parts)
+    """
+
+    if bounds is not None:
+        parts = len(bounds) + 1
+    output = []
+    for (low, width) in zip(*stripe_limits(parts, sep, bounds)):
+        high = low + width
+        if horizontal:
+            output.append(([(0, low, ratio, high)], None))
+        else:
+            output.append(([(ratio*low, 0, ratio*high, 1)], None))
+    return(output)
+
+def japan_flag_regions(cenx=0.5, ceny=0.5, rx=0.3, ry=0.3, sep=0.0,
+                       ratio=1.5):
+
+    """Partition regions of japan_flag (see simple_flag_regions)
+
+    Parameters
+    ----------
+    cenx, ceny, rx, ry, sep, ratio : see japan_flag
+
+    Returns
+    -------
+    output : list of (boxes, test) tuples (length = 2)
+    """
+
+    cx, cy = cenx*ratio, ceny
+    inside = _ellipse_test(cx, cy, rx, ry)
+    boundary = _ellipse_test(cx, cy, rx + sep, ry + sep)
+    return([([(cx - rx, cy - ry, cx + rx, cy + ry)], inside),
+            ([(0, 0, ratio, 1)], lambda x, y: ~boundary(x, y))])
+
+def laos_flag_regions(cenx=0.5, ceny=0.5, rx=0.2, ry=0.2, rect=0.25,
+                      ratio=1.5, horizontal=True):
+
+    """Partition regions of laos_flag (see simple_flag_regions)
+
+    Parameters
+    ----------
+    cenx, ceny, rx, ry, rect, ratio, horizontal : see laos_flag
+
+    Returns
+    -------
+    output : list of (boxes, test) tuples (length = 3)
+    """
+
+    if horizontal:
+        borders = [(0, 0, ratio, rect), (0, 1 - rect, ratio, 1)]
+        middle = (0, rect, ratio, 1 - rect)
+        cx, cy = cenx*ratio, rect + ceny*(1 - 2*rect)
+    else:
+        borders = [(0, 0, rect*ratio, 1), ((1 - rect)*ratio, 0, ratio, 1)]
+        middle = (rect*ratio, 0, (1 - rect)*ratio, 1)
+        cx, cy = (rect + cenx*(1 - 2*rect))*ratio, ceny
+    inside = _ellipse_test(cx, cy, rx, ry)
+    return([(borders, None),
+            ([(cx - rx, cy - ry, cx + rx, cy + ry)], inside),
+            ([middle], lambda x, y: ~inside(x, y))])
+
+def cross_flag_regions(cenx=0.5, ceny=0.5, rectx=0.2, recty=0.2, ratio=1.5):
+
+    """Partition regions of cross_flag (see simple_flag_regions)
+
+    Parameters
+    ----------
+    cenx, ceny, rectx, recty, ratio : see cross_flag
+
+    Returns
+    -------
+    output : list of (boxes, test) tuples (length = 5)
+    """
+
+    left, right = cenx*ratio - rectx/2, cenx*ratio + rectx/2
+    bottom, top = ceny - recty/2, ceny + recty/2
+    return([([(0, top, left, 1)], None),
+            ([(0, 0, left, bottom)], None),
+            ([(right, top, ratio, 1)], None),
+            ([(right, 0, ratio, bottom)], None),
+            ([(0, bottom, ratio, top), (left, top, right, 1),
+              (left, 0, right, bottom)], None)])
+
+def crescent_flag_regions(bcx=0.5, bcy=0.5, scx=0.53, scy=0.5, bradius=0.125,
+                          sradius=0.1, starcx=0.6, starcy=0.5, starrx=0.05,
+                          starry=0.05, rect=0.2, ratio=1.5, horizontal=True):
+
+    """Partition regions of crescent_flag (see simple_flag_regions)
+
+    Parameters
+    ----------
+    bcx, bcy, scx, scy, bradius, sradius, starcx, starcy, starrx, starry,
+    rect, ratio, horizontal : see crescent_flag
+
+    Returns
+    -------
+    output : list of (boxes, test) tuples (length = 5)
+    """
+
+    bcx, scx, starcx = bcx*ratio, scx*ratio, starcx*ratio
+    big = _ellipse_test(bcx, bcy, bradius, bradius)
+    small = _ellipse_test(scx, scy, sradius, sradius)
+    star = (starcx - starrx, starcy - starry, starcx + starrx, starcy + starry)
+
+    def crescent(x, y):
+        return(big(x, y) & ~small(x, y))
+
+    def background(x, y):
+        in_star = ((star[0] < x) & (x < star[2]) &
+                   (star[1] < y) & (y < star[3]))
+        return(~(crescent(x, y) | in_star))
+
+    if horizontal:
+        middle = (0, rect, ratio, 1 - rect)
+        borders = [(0, 0, ratio, rect), (0, 1 - rect, ratio, 1)]
+    else:
+        middle = (rect*ratio, 0, (1 - rect)*ratio, 1)
+        borders = [(0, 0, rect*ratio, 1), ((1 - rect)*ratio, 0, ratio, 1)]
+    return([([(bcx - bradius, bcy - bradius, bcx + bradius, bcy + bradius)],
+             crescent),
+            ([star], None),
+            ([middle], background),
+            ([borders[0]], None),
+            ([borders[1]], None)])
+
+def _ellipse_test(cx, cy, rx, ry):
+    def test(x, y):
+        return(((x - cx)/rx)**2 + ((y - cy)/ry)**2 < 1)
+    return(test)
+
+def _flag_function(flag, suffix):
+    name = getattr(flag, '__name__', flag)
+    function = globals().get(str(name) + suffix)
+    if function is None:
+        raise ValueError("Unknown flag: {}".format(name))
+    return(function)
+
+def _arg_names(function):
+    code = function.__code__
+    return(code.co_varnames[:code.co_argcount])
+
+def _call(flag, suffix, params):
+    name = getattr(flag, '__name__', flag)
+    unknown = sorted(set(params) - set(flag_params(flag)) - set(builder_args))
+    if unknown:
+        raise TypeError("Unknown arguments for {}: {}".format(
+            name, ", ".join(unknown)))
+    params = _partition_count(flag, params)
+    # same range checks as the flag builder (not every flag has one)
+    check = globals().get(str(name) + '_check')
+    if check is not None:
+        _apply(check, params)
+    return(_apply(_flag_function(flag, suffix), params))
+
+def _apply(function, params):
+    names = _arg_names(function)
+    return(function(**dict((k, v) for (k, v) in params.items()
+                           if k in names)))
@@ -0,0 +1,115 @@
+""" lifting: Embed flags in high dimensional spaces
+"""
+
+import numpy as np
+
+def projection_matrix(dims, orthogonal=True, seed=None):
+
+    """Random linear map from the plane into dims dimensions
+
+    Parameters
+    ----------
+    dims : int, no default, required
+        Number of dimensions of the embedding space (at least 2)
+
+    orthogonal : boolean, default True
+        If True, the two rows of the matrix are orthonormal, so distances
+        between points (and hence the shape of the flag) are preserved
+        exactly. If False, the entries are independent gaussians with
+        variance 1/dims, which preserves distances on average only.
+
+    seed : int or numpy Generator, default None
+        Seed of the random number generator
+
+    Returns
+    -------
+    output : float32 numpy array (shape = (2, dims))
+    """
+
+    if dims < 2:
+        raise ValueError("dims must be at least 2")
+    rng = np.random.default_rng(seed)
+    gauss = rng.standard_normal((dims, 2))
+    if orthogonal:
+        q, r = np.linalg.qr(gauss)
+        # fix signs so that the matrix is uniformly distributed
+        gauss = q*np.sign(np.diag(r))
+    else:
+        gauss /= np.sqrt(dims)
+    return(np.ascontiguousarray(gauss.T, dtype=np.float32))
+
+def lift_flag(points, dims, noise=0.0, orthogonal=True, seed=None,
+              chunk_size=None, out=None):
+
+    """Embed a flag in a high dimensional space
+
+    Projects the points of a flag into dims dimensions with a random linear
+    map (see projection_matrix) and optionally adds gaussian noise to each
+    dimension. The rows are processed in chunks that fit in the CPU cache,
+    each projected with a single BLAS matrix product written directly into
+    the (preallocated) float32 output, so no full size temporary arrays are
+    created. Passing a numpy memmap as out allows datasets larger than
+    memory (e.g. 10^7 x 256) to be generated.
+    The order of the rows is unchanged, so the partition column of the
+    flag remains the ground truth of the embedded points.
+
+    Parameters
+    ----------
+    points : pandas data frame or numpy array (shape = (n, 2)), required
+        Output of a flag builder (the x and y columns are used) or the
+        x and y coordinates of the points
+
+    dims : int, no default, required
+        Number of dimensions of the embedding space (at least 2)
+
+    noise : float or float list (length = dims), default 0
+        Standard deviation of the gaussian noise added to each dimension.
+        A list sets the standard deviation of each dimension separately.
+
+    orthogonal : boolean, default True
+        Orthogonal (distance preserving) or gaussian random projection
+        (see projection_matrix)
+
+    seed : int, default None
+        Seed of the random number generator (used for both the projection
+        and the noise)
+
+    chunk_size : int, default None
+        Number of rows processed at a time. Defaults to the number of rows
+        that fit in 1MB of output.
+
+    out : float32 numpy array (shape = (n, dims)), default None
+        Preallocated output (e.g. np.memmap). Must be C-contiguous.
+
+    Returns
+    -------
+    output : float32 numpy array (shape = (n, dims))
+    """
+
+    if hasattr(points, 'columns'):
+        points = points[['x', 'y']].values
+    points = np.asarray(points)
+    if points.ndim != 2 or points.shape[1] != 2:
+        raise ValueError("points must have shape (n, 2)")
+    if out is None:
+        out = np.empty((len(points), dims), dtype=np.float32)
+    elif (out.shape != (len(points), dims) or out.dtype != np.float32 or
+          not out.flags['C_CONTIGUOUS']):
+        raise ValueError("out must be a C-contiguous float32 array "
+                         "of shape (n, dims)")
+    if chunk_size is None:
+        chunk_size = max(1, 2**18//dims)
+    rng = np.random.default_rng(seed)
+    proj = projection_matrix(dims, orthogonal=orthogonal, seed=rng)
+    noise = np.asarray(noise, dtype=np.float32)
+    scratch = np.empty((min(chunk_size, len(points)), dims), dtype=np.float32)
+    for start in range(0, len(points), chunk_size):
+        stop = min(start + chunk_size, len(points))
+        chunk = out[start:stop]
+        np.matmul(points[start:stop].astype(np.float32), proj, out=chunk)
+        if np.any(noise != 0):
+            gauss = scratch[:stop - start]
+            rng.standard_normal(dtype=np.float32, out=gauss)
+            gauss *= noise
+            chunk += gauss
+    return(out)
@@ -0,0 +1,218 @@
+""" metrics: Streaming clustering scores against flag partitions
+"""
+
+import numpy as np
+
+def contingency_table(labels_true, labels_pred, table=None):
+
+    """Count points per (partition, cluster) pair
+
+    Builds the contingency table between the true partitions (e.g. the
+    partition column of a flag) and the predicted clusters with a single
+    np.bincount call. Passing the output back in as table accumulates
+    further chunks, so the labels never need to be held in memory at once:
+    memory is O(partitions x clusters) rather than O(npoints).
+    Tables computed on different chunks (e.g. in parallel) can be combined
+    with merge_tables.
+
+    Parameters
+    ----------
+    labels_true : int array, no default, required
+        True partition of each point, starting from 0
+
+    labels_pred : int array, no default, required
+        Predicted cluster of each point, starting from 0.
+        Noise labels (e.g. -1 from DBSCAN) should be mapped to a cluster of
+        their own beforehand (e.g. labels_pred + 1).
+
+    table : int numpy array (shape = (partitions, clusters)), default None
+        Table from previous chunks. The table grows if this chunk includes
+        new partitions or clusters.
+
+    Returns
+    -------
+    table : int numpy array (shape = (partitions, clusters))
+        Number of points from the i-th partition assigned to the j-th cluster
+    """
+
+    labels_true = np.asarray(labels_true)
+    labels_pred = np.asarray(labels_pred)
+    if len(labels_true) != len(labels_pred):
+        raise ValueError("labels_true and labels_pred must be same length")
+    if table is None:
+        table = np.zeros((0, 0), dtype=np.int64)
+    if len(labels_true) == 0:
+        return(table)
+    if labels_true.min() < 0 or labels_pred.min() < 0:
+        raise ValueError("labels must not be negative")
+    nrows = max(table.shape[0], int(labels_true.max()) + 1)
+    ncols = max(table.shape[1], int(labels_pred.max()) + 1)
+    cells = labels_true.astype(np.intp)*ncols + labels_pred
+    counts = np.bincount(cells, minlength=nrows*ncols).reshape(nrows, ncols)
+    counts[:table.shape[0], :table.shape[1]] += table
+    return(counts)
+
+def merge_tables(tables):
+
+    """Combine contingency tables from different chunks
+
+    Parameters
+    ----------
+    tables : list of int numpy arrays, no default, required
+        Outputs of contingency_table, which may have different shapes
+        (e.g. if a cluster is absent from some chunks)
+
+    Returns
+    -------
+    table : int numpy array (shape = (partitions, clusters))
+    """
+
+    tables = list(tables)
+    nrows = max([0] + [table.shape[0] for table in tables])
+    ncols = max([0] + [table.shape[1] for table in tables])
+    output = np.zeros((nrows, ncols), dtype=np.int64)
+    for table in tables:
+        output[:table.shape[0], :table.shape[1]] += table
+    return(output)
+
+def adjusted_rand(table):
+
+    """Adjusted Rand index computed from a contingency table
+
+    Equivalent to sklearn.metrics.adjusted_rand_score on the labels
+    that produced the table.
+
+    Parameters
+    ----------
+    table : int numpy array, no default, required
+        Output of contingency_table or merge_tables
+
+    Returns
+    -------
+    output : float
+        1.0 for identical clusterings, close to 0.0 for random clusterings
+    """
+
+    table = np.asarray(table, dtype=np.float64)
+    n = table.sum()
+    pairs = (table*(table - 1)/2).sum()
+    true_pairs = _pairs(table.sum(axis=1))
+    pred_pairs = _pairs(table.sum(axis=0))
+    expected = true_pairs*pred_pairs/(n*(n - 1)/2) if n > 1 else 0.0
+    maximum = (true_pairs + pred_pairs)/2
+    if maximum == expected:
+        return(1.0)
+    return(float((pairs - expected)/(maximum - expected)))
+
+def normalized_mutual_info(table):
+
+    """Normalized mutual information computed from a contingency table
+
+    The mutual information is normalized by the arithmetic mean of the
+    entropies of the partitions and clusters, which matches the default of
+    sklearn.metrics.normalized_mutual_info_score.
+
+    Parameters
+    ----------
+    table : int numpy array, no default, required
+        Output of contingency_table or merge_tables
+
+    Returns
+    -------
+    output : float
+        Between 0.0 (independent) and 1.0 (identical clusterings)
+    """
+
+    table = np.asarray(table, dtype=np.float64)
+    n = table.sum()
+    if n == 0:
+        return(1.0)
+    true_probs = table.sum(axis=1)/n
+    pred_probs = table.sum(axis=0)/n
+    h_true = _entropy(true_probs)
+    h_pred = _entropy(pred_probs)
+    if h_true == 0 and h_pred == 0:
+        return(1.0)
+    rows, cols = np.nonzero(table)
+    probs = table[rows, cols]/n
+    mutual_info = np.sum(probs*np.log(probs/(true_probs[rows] *
+                                             pred_probs[cols])))
+    return(float(max(mutual_info, 0.0)/((h_true + h_pred)/2)))
+
+def purity(table):
+
+    """Purity computed from a contingency table
+
+    The fraction of points that belong to the most common partition
+    of their cluster.
+
+    Parameters
+    ----------
+    table : int numpy array, no default, required
+        Output of contingency_table or merge_tables
+
+    Returns
+    -------
+    output : float
+    """
+
+    table = np.asarray(table)
+    if table.sum() == 0:
+        return(1.0)
+    return(float(table.max(axis=0).sum()/table.sum()))
+
+def partition_recall(table):
+
+    """Recall of each partition computed from a contingency table
+
+    For each partition, the fraction of its points that were assigned to
+    the cluster that captured most of them.
+
+    Parameters
+    ----------
+    table : int numpy array, no default, required
+        Output of contingency_table or merge_tables
+
+    Returns
+    -------
+    output : float numpy array (length = partitions)
+        nan for partitions without any points
+    """
+
+    table = np.asarray(table, dtype=np.float64)
+    sizes = table.sum(axis=1)
+    output = np.full(table.shape[0], np.nan)
+    if table.shape[1] > 0:
+        filled = sizes > 0
+        output[filled] = table[filled].max(axis=1)/sizes[filled]
+    return(output)
+
+def cluster_scores(table):
+
+    """All scores computed from a contingency table
+
+    Parameters
+    ----------
+    table : int numpy array, no default, required
+        Output of contingency_table or merge_tables
+
+    Returns
+    -------
+    output : dict
+        ari: adjusted Rand index (see adjusted_rand)
+        nmi: normalized mutual information (see normalized_mutual_info)
+        purity: purity (see purity)
+        recall: recall of each partition (see partition_recall)
+    """
+
+    return({'ari': adjusted_rand(table),
+            'nmi': normalized_mutual_info(table),
+            'purity': purity(table),
+            'recall': partition_recall(table)})
+
+def _pairs(counts):
+    return(np.sum(counts*(counts - 1)/2))
+
+def _entropy(probs):
+    probs = probs[probs > 0]
+    return(-np.sum(probs*np.log(probs)))
@@ -0,0 +1,216 @@
+""" render: Rasterize large flags into RGB images with numpy
+"""
+
+import numpy as np
+
+# default colours (RGB) assigned to labels 0, 1, 2, ... when none are given
+default_colours = [(0.122, 0.467, 0.706), (1.0, 0.498, 0.055),
+                   (0.173, 0.627, 0.173), (0.839, 0.153, 0.157),
+                   (0.580, 0.404, 0.741), (0.549, 0.337, 0.294),
+                   (0.890, 0.467, 0.761), (0.498, 0.498, 0.498),
+                   (0.737, 0.741, 0.133), (0.090, 0.745, 0.812)]
+
+def flag_counts(points, labels, width, height, nlabels=None,
+                xlim=(0, 1.5), ylim=(0, 1), counts=None):
+
+    """Count points per pixel and per label
+
+    Bins the points into a width x height grid covering xlim x ylim, keeping
+    a separate count image for each label. All points are binned at once
+    with a single np.bincount call on the flattened (label, row, column)
+    cell index, so no python loop runs over the points.
+    Passing the output back in as counts accumulates further chunks into
+    the same images, which means datasets that don't fit in memory can be
+    rendered chunk by chunk. The images grow if a chunk includes new
+    labels, so always keep the returned counts (e.g. c = flag_counts(...,
+    counts=c)).
+
+    Parameters
+    ----------
+    points : numpy array (shape = (n, 2)), no default, required
+        x and y coordinates of the points (e.g. flag[['x', 'y']].values)
+
+    labels : int array (length = n), no default, required
+        Label (partition or cluster) of each point, starting from 0.
+        Points with a negative label (e.g. noise) are ignored.
+
+    width : int, no default, required
+        Number of pixels along the x-axis
+
+    height : int, no default, required
+        Number of pixels along the y-axis
+
+    nlabels : int, default None
+        Minimum number of count images, e.g. the number of distinct labels
+        across all chunks. Defaults to max(labels) + 1.
+        Ignored if counts is supplied.
+
+    xlim : float tuple, default (0, 1.5)
+        Range of x-axis covered by the image.
+        Points outside of xlim or ylim are ignored.
+
+    ylim : float tuple, default (0, 1)
+        Range of y-axis covered by the image
+
+    counts : int numpy array (shape = (nlabels, height, width)), default None
+        Counts from previous chunks. If supplied, the counts of this chunk
+        are added to it in place, unless this chunk includes labels of
+        nlabels or more, in which case a larger copy is returned.
+
+    Returns
+    -------
+    counts : int numpy array (shape = (nlabels, height, width))
+        Number of points of each label within each pixel.
+        Row 0 corresponds to the top of the flag (i.e. ylim[1]).
+    """
+
+    points = np.asarray(points)
+    if not np.issubdtype(points.dtype, np.floating):
+        points = points.astype(np.float64)
+    labels = np.asarray(labels)
+    if len(points) != len(labels):
+        raise ValueError("points and labels parameters must be same length")
+    needed = int(labels.max()) + 1 if len(labels) else 0
+    if counts is None:
+        nlabels = max(nlabels or 0, needed)
+        counts = np.zeros((nlabels, height, width), dtype=np.int64)
+    elif counts.shape[1:] != (height, width):
+        raise ValueError("counts must have shape (nlabels, height, width)")
+    elif counts.shape[0] < needed:
+        # new labels in this chunk: grow the images, as in contingency_table
+        grown = np.zeros((needed, height, width), dtype=counts.dtype)
+        grown[:counts.shape[0]] = counts
+        counts = grown
+    if needed <= 0:
+        return(counts)
+    # pixel coordinates (computed in place to limit temporary arrays)
+    cols = points[:, 0] - xlim[0]
+    cols *= width/(xlim[1] - xlim[0])
+    rows = ylim[1] - points[:, 1]
+    rows *= height/(ylim[1] - ylim[0])
+    keep = (cols >= 0) & (cols <= width) & (rows >= 0) & (rows <= height)
+    if labels.min() < 0:
+        keep &= labels >= 0
+    if not keep.all():
+        cols, rows, labels = cols[keep], rows[keep], labels[keep]
+    cols = cols.astype(np.intp)
+    rows = rows.astype(np.intp)
+    # points lying exactly on the right/bottom edge belong to the last pixel
+    np.minimum(cols, width - 1, out=cols)
+    np.minimum(rows, height - 1, out=rows)
+    cells = labels.astype(np.intp)
+    cells *= height
+    cells += rows
+    cells *= width
+    cells += cols
+    counts += np.bincount(cells, minlength=counts.size).reshape(counts.shape)
+    return(counts)
+
+def colour_counts(counts, colours=None, background=(0.902, 0.902, 0.902)):
+
+    """Convert per-label count images into an RGB image
+
+    Each pixel takes the average colour of the points that fall within it,
+    so pixels shared by several labels (e.g. partition boundaries or
+    misclustered points) are shown as a blend of their colours.
+    Pixels without any points take the background colour.
+
+    Parameters
+    ----------
+    counts : int numpy array (shape = (nlabels, height, width)), required
+        Output of flag_counts
+
+    colours : list, default None
+        Colour of each label, where the i-th value determines the colour of
+        the points with label i. Values can be RGB tuples in [0, 1] or, if
+        matplotlib is installed, any matplotlib colour (e.g. 'green').
+        Defaults to a ten colour palette (repeated if necessary).
+
+    background : RGB tuple or matplotlib colour, default (0.902, 0.902, 0.902)
+        Colour of empty pixels
+
+    Returns
+    -------
+    output : float numpy array (shape = (height, width, 3))
+        RGB image with values in [0, 1] (e.g. for plt.imshow)
+    """
+
+    nlabels = counts.shape[0]
+    if colours is None:
+        colours = [default_colours[i % len(default_colours)]
+                   for i in range(nlabels)]
+    if len(colours) < nlabels:
+        raise ValueError("colours must include a colour for every label")
+    rgb = np.array([_to_rgb(colour) for colour in colours[:nlabels]],
+                   dtype=np.float64)
+    rgb = rgb.reshape(nlabels, 3)
+    total = counts.sum(axis=0)
+    output = np.tensordot(counts, rgb, axes=(0, 0))
+    filled = total > 0
+    output[filled] /= total[filled][:, np.newaxis]
+    output[~filled] = _to_rgb(background)
+    return(output)
+
+def render_flag(points, labels, width, height, colours=None,
+                xlim=(0, 1.5), ylim=(0, 1), background=(0.902, 0.902, 0.902)):
+
+    """Rasterize a flag (or clustering output) into an RGB image
+
+    A fast alternative to plotting every point with plt.scatter. The points
+    are binned into a per-pixel, per-label count image (see flag_counts),
+    which is then converted into colours (see colour_counts).
+    For datasets that don't fit in memory, call flag_counts on each chunk
+    and pass the accumulated counts to colour_counts.
+
+    Parameters
+    ----------
+    points : numpy array (shape = (n, 2)), no default, required
+        x and y coordinates of the points (e.g. flag[['x', 'y']].values)
+
+    labels : int array (length = n), no default, required
+        Label (partition or cluster) of each point, starting from 0
+        (e.g. pd.factorize(flag['flag_col'])[0] or the output of a
+        clustering algorithm)
+
+    width : int, no default, required
+        Number of pixels along the x-axis
+
+    height : int, no default, required
+        Number of pixels along the y-axis
+
+    colours : list, default None
+        Colour of each label (see colour_counts)
+
+    xlim : float tuple, default (0, 1.5)
+        Range of x-axis covered by the image
+
+    ylim : float tuple, default (0, 1)
+        Range of y-axis covered by the image
+
+    background : RGB tuple or matplotlib colour, default (0.902, 0.902, 0.902)
+        Colour of empty pixels
+
+    Returns
+    -------
+    output : float numpy array (shape = (height, width, 3))
+        RGB image with values in [0, 1],
+        e.g. plt.imshow(output, extent=[0, 1.5, 0, 1])
+    """
+
+    labels = np.asarray(labels)
+    nlabels = None if colours is None else len(colours)
+    if nlabels is not None and len(labels) and labels.max() >= nlabels:
+        raise ValueError("colours must include a colour for every label")
+    counts = flag_counts(points, labels, width, height, nlabels=nlabels,
+                         xlim=xlim, ylim=ylim)
+    return(colour_counts(counts, colours=colours, background=background))
+
+def _to_rgb(colour):
+    if isinstance(colour, str):
+        try:
+            from matplotlib.colors import to_rgb
+        except ImportError:
+            raise ImportError("matplotlib is required for named colours; "
+                              "use RGB tuples instead")
+        return(to_rgb(colour))
+    return(tuple(colour))
@@ -0,0 +1,132 @@
+""" sampling: Vectorized sampling of flag partitions with numpy generators
+"""
+
+import numpy as np
+from .geometry import (allocate_points, flag_areas, flag_regions,
+                       partition_npoints)
+
+def sample_region(rng, region, npoints):
+
+    """Uniformly distribute points within a flag partition
+
+    Points are drawn uniformly from the boxes of the region (each box is
+    chosen in proportion to its area) and, if the region has a test,
+    rejected in batches until npoints points lie within the region.
+    All steps are vectorized, and the output depends only on the state of
+    rng and npoints.
+
+    Parameters
+    ----------
+    rng : numpy Generator, no default, required
+        Source of random numbers (e.g. np.random.default_rng(0))
+
+    region : (boxes, test) tuple, no default, required
+        Partition region (e.g. an element of geometry.cross_flag_regions)
+
+    npoints : int, no default, required
+        The number of points to generate
+
+    Returns
+    -------
+    output : numpy array (shape = (npoints, 2))
+    """
+
+    boxes, test = region
+    boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+    areas = (boxes[:, 2] - boxes[:, 0])*(boxes[:, 3] - boxes[:, 1])
+    output = np.empty((npoints, 2))
+    if npoints == 0:
+        return(output)
+    if areas.sum() <= 0:
+        raise ValueError("Cannot distribute points within an empty region")
+    filled = 0
+    accept_rate = 1.0
+    misses = 0
+    while filled < npoints:
+        # oversample to (usually) fill the remaining points in one batch
+        batch = int((npoints - filled)/accept_rate*1.1) + 16
+        if len(boxes) > 1:
+            box = boxes[rng.choice(len(boxes), size=batch,
+                                   p=areas/areas.sum())]
+        else:
+            box = boxes[[0]]
+        points = rng.random((batch, 2))
+        points *= box[:, 2:] - box[:, :2]
+        points += box[:, :2]
+        if test is not None:
+            points = points[test(points[:, 0], points[:, 1])]
+            accept_rate = max(len(points)/batch, 0.01)
+            misses = misses + 1 if len(points) == 0 else 0
+            if misses > 100:
+                raise ValueError("Cannot distribute points within an empty "
+                                 "region")
+        points = points[:npoints - filled]
+        output[filled:filled + len(points)] = points
+        filled += len(points)
+    return(output)
+
+def sample_flag(flag, npoints=None, seed=None, total=None, density=None,
+                weights=None, **params):
+
+    """Generate a flag as numpy arrays
+
+    A lightweight alternative to the flag builders in country_flags, which
+    needs numpy only (pandas isn't imported) and draws every partition with
+    vectorized operations from its own numpy Generator. This makes it
+    suitable for short-lived worker processes and very large flags.
+    The arguments have the same meaning as in the flag builders.
+    Points are uniformly distributed within each partition, as in the flag
+    builders with total or density. With npoints, the builders' ellipses
+    (japan_flag, laos_flag) are denser near the centre and their cross
+    (cross_flag) is denser where the arms overlap, so the distribution of
+    the points differs from the builders' output.
+
+    Parameters
+    ----------
+    flag : string or function, no default, required
+        Flag (e.g. 'cross_flag' or cross_flag)
+
+    npoints : int list, default None
+        The number of points within each partition, as in the flag builders
+        (e.g. laos_flag draws npoints[0] points within each border).
+        Required unless total or density is specified.
+
+    seed : int or numpy Generator, default None
+        Seed of the random number generator
+
+    total, density, weights :
+        Allocate points to partitions in proportion to their area instead
+        of npoints (see geometry.allocate_points)
+
+    **params :
+        Flag geometry (e.g. cenx=0.4 for cross_flag), see the flag builders.
+        Builder arguments that don't affect the geometry (e.g. colours) are
+        ignored, while unknown arguments raise a TypeError.
+
+    Returns
+    -------
+    points : numpy array (shape = (number of points, 2))
+        x and y coordinates of the points
+
+    labels : int numpy array (length = number of points)
+        Index of the partition containing each point
+    """
+
+    rng = np.random.default_rng(seed)
+    # npoints and weights determine the number of stripes of simple_flag
+    params = dict(params, npoints=npoints, weights=weights)
+    if total is not None or density is not None:
+        # rows per partition (e.g. both borders of laos_flag together)
+        sizes = allocate_points(flag_areas(flag, **params), total=total,
+                                density=density, weights=weights, rng=rng)
+    elif npoints is None:
+        raise ValueError("Specify one of npoints, total and density")
+    else:
+        sizes = partition_npoints(flag, npoints)
+    regions = flag_regions(flag, **params)
+    if len(sizes) != len(regions):
+        raise ValueError("npoints must include a value for every partition")
+    points = np.concatenate([sample_region(rng, region, n)
+                             for (region, n) in zip(regions, sizes)])
+    labels = np.repeat(np.arange(len(regions)), sizes)
+    return(points, labels)
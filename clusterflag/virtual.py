@@ -0,0 +1,175 @@
+""" virtual: Lazy flags with random access to any slice of rows
+"""
+
+import numbers
+import numpy as np
+from .geometry import flag_regions, partition_npoints
+from .sampling import sample_region
+
+class VirtualFlag(object):
+
+    """Flag whose rows are generated on demand
+
+    A VirtualFlag behaves like a (read-only) numpy array with one row per
+    point, but no points are generated until rows are requested.
+    The rows of each partition are split into blocks of block_size rows,
+    and every block is generated from its own counter-based random number
+    generator (Philox) whose counter is determined by the partition and
+    block index. Any slice [a, b) therefore costs O(b - a) (plus at most
+    two partial blocks per partition), and returns identical values
+    whichever process or machine requests it, provided that every shard
+    constructs the VirtualFlag with the same flag, npoints, seed,
+    block_size and geometry params (e.g. by sharing the attributes of one
+    instance).
+
+    Rows are ordered by partition, as in the output of the flag builders,
+    and points are distributed as in sampling.sample_flag.
+
+    Parameters
+    ----------
+    flag : string or function, no default, required
+        Flag (e.g. 'cross_flag' or cross_flag)
+
+    npoints : int list, no default, required
+        The number of points within each partition, as in the flag builders
+        (e.g. laos_flag draws npoints[0] points within each border)
+
+    seed : int, default None
+        Seed of the random number generator. If None, a random seed is
+        chosen and stored in the seed attribute, which must then be passed
+        to the other shards.
+
+    block_size : int, default 65536
+        Number of rows generated together. The values of each row depend on
+        block_size, so it must be the same across shards.
+
+    **params :
+        Flag geometry (e.g. cenx=0.4 for cross_flag), see the flag builders.
+        Builder arguments that don't affect the geometry (e.g. colours) are
+        ignored, while unknown arguments raise a TypeError.
+
+    Examples
+    --------
+    >>> flag = VirtualFlag('cross_flag', [10**8]*5, seed=0)
+    >>> shard = flag[2*10**8:2*10**8 + 10**6]
+    >>> labels = flag.labels(2*10**8, 2*10**8 + 10**6)
+    """
+
+    def __init__(self, flag, npoints, seed=None, block_size=65536, **params):
+        self.regions = flag_regions(flag, npoints=npoints, **params)
+        if len(npoints) != len(self.regions):
+            raise ValueError("npoints must include a value for every "
+                             "partition")
+        if seed is None:
+            seed = np.random.SeedSequence().entropy
+        self.seed = seed
+        self.block_size = block_size
+        self.npoints = [int(n) for n in npoints]
+        # rows within each partition (may differ from npoints, see laos_flag)
+        self.sizes = partition_npoints(flag, npoints)
+        self.offsets = np.concatenate(([0], np.cumsum(self.sizes)))
+        self._key = np.random.SeedSequence(seed).generate_state(2, np.uint64)
+
+    ndim = 2
+    dtype = np.dtype(np.float64)
+
+    @property
+    def shape(self):
+        return((int(self.offsets[-1]), 2))
+
+    def __len__(self):
+        return(self.shape[0])
+
+    def __getitem__(self, key):
+        if isinstance(key, tuple):
+            rows = self[key[0]]
+            if rows.ndim == 1:
+                return(rows[key[1:]])
+            return(rows[(slice(None),) + key[1:]])
+        if isinstance(key, numbers.Integral):
+            if key < 0:
+                key += len(self)
+            if not 0 <= key < len(self):
+                raise IndexError("row index out of range")
+            return(self.rows(np.array([key]))[0])
+        return(self.rows(self._indices(key)))
+
+    def __array__(self, dtype=None, copy=None):
+        return(np.asarray(self[:], dtype=dtype))
+
+    def labels(self, start=0, stop=None):
+
+        """Partition of rows start to stop (no random numbers are drawn)"""
+
+        rows = self._indices(slice(start, stop))
+        return(np.searchsorted(self.offsets, rows, side='right') - 1)
+
+    def rows(self, rows):
+
+        """Points of the given rows
+
+        Parameters
+        ----------
+        rows : int array, no default, required
+            Row indices (from 0 to len(self) - 1), in any order
+
+        Returns
+        -------
+        output : numpy array (shape = (len(rows), 2))
+        """
+
+        rows = np.asarray(rows, dtype=np.int64)
+        output = np.empty((len(rows), 2))
+        parts = np.searchsorted(self.offsets, rows, side='right') - 1
+        local = rows - self.offsets[parts]
+        blocks = local//self.block_size
+        # group the rows by (partition, block) and generate each block once
+        keys = parts*(max(self.sizes)//self.block_size + 1) + blocks
+        order = np.argsort(keys, kind='stable')
+        groups = np.split(order, np.flatnonzero(np.diff(keys[order])) + 1)
+        for group in groups:
+            if len(group) == 0:
+                continue
+            part, block = parts[group[0]], blocks[group[0]]
+            points = self.block(part, block)
+            output[group] = points[local[group] - block*self.block_size]
+        return(output)
+
+    def block(self, part, block):
+
+        """Points of a block of rows within a partition
+
+        Parameters
+        ----------
+        part : int, no default, required
+            Index of the partition
+
+        block : int, no default, required
+            Index of the block within the partition
+
+        Returns
+        -------
+        output : numpy array (shape = (rows in block, 2))
+        """
+
+        npoints = min(self.block_size,
+                      self.sizes[part] - block*self.block_size)
+        if npoints <= 0:
+            raise IndexError("block index out of range")
+        # the upper half of the counter identifies the block, so every
+        # block has its own (non-overlapping) stream of random numbers
+        bitgen = np.random.Philox(key=self._key,
+                                  counter=[0, 0, int(block), int(part)])
+        return(sample_region(np.random.Generator(bitgen),
+                             self.regions[part], npoints))
+
+    def _indices(self, key):
+        if isinstance(key, slice):
+            return(np.arange(*key.indices(len(self))))
+        rows = np.asarray(key)
+        if rows.dtype == bool:
+            return(np.flatnonzero(rows))
+        rows = np.where(rows < 0, rows + len(self), rows)
+        if len(rows) and (rows.min() < 0 or rows.max() >= len(self)):
+            raise IndexError("row index out of range")
+        return(rows)
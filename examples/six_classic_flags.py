@@ -2,6 +2,7 @@ import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
 from clusterflag.country_flags import *
+from clusterflag.render import render_flag
 
 irelandFlag = simple_flag(npoints=[100000]*3)
 japanFlag = japan_flag(npoints=[100000]*2)
@@ -21,13 +22,13 @@ f, axarr = plt.subplots(3, 2, figsize=(14, 14), dpi=80)
 for pos,flag in enumerate(countryFlags):
     fig_row = int(pos/2)
     fig_col = pos%2
-    axarr[fig_row, fig_col].set_xlim([0,1.5])
-    axarr[fig_row, fig_col].set_ylim([0,1])
     axarr[fig_row, fig_col].set_xticks([])
     axarr[fig_row, fig_col].set_yticks([])
-    axarr[fig_row, fig_col].set_axis_bgcolor('#e6e6e6')
-    axarr[fig_row, fig_col].scatter(flag['x'], flag['y'],
-                                    c=flag['flag_col'], marker='o',
-                                    linewidths=0)
+    # rasterizing is much faster than plt.scatter for large flags
+    labels, colours = pd.factorize(flag['flag_col'])
+    axarr[fig_row, fig_col].imshow(render_flag(flag[['x', 'y']].values,
+                                               labels, 600, 400,
+                                               colours=list(colours)),
+                                   extent=[0, 1.5, 0, 1])
 plt.show()
 
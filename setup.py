@@ -15,9 +15,8 @@ setup(name='cluster-flag',
         'License :: OSI Approved :: MIT License',
         'Programming Language :: Python',
         'Programming Language :: Python :: 3',
-        'Programming Language :: Python :: 3.4',
-        'Programming Language :: Python :: 3.5',
-        'Programming Language :: Python :: 3.6',
+        'Programming Language :: Python :: 3.7',
+        'Programming Language :: Python :: 3.8',
         'Operating System :: OS Independent',
         'Intended Audience :: Science/Research',
         'Intended Audience :: Developers',
@@ -26,7 +25,8 @@ setup(name='cluster-flag',
       ],
       license='MIT',
       packages=['clusterflag'],
+      python_requires='>=3.7',
       install_requires=[
         'pandas>=0.17.1',
-        'numpy>=1.11.0'],
+        'numpy>=1.17.0'],
       zip_safe=False)
\ No newline at end of file